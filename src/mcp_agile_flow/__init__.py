@@ -19,7 +19,7 @@ import json
 from typing import Dict, Any
 
 from .version import __version__, get_version
-from .utils import detect_mcp_command
+from .utils import detect_mcp_command, loads_json
 
 # List of supported tools
 SUPPORTED_TOOLS = [
@@ -34,6 +34,11 @@ SUPPORTED_TOOLS = [
     "get_thought_stats",
     "process_natural_language",
 ]
+# Listed in the error for unsupported tool names
+_SUPPORTED_TOOLS_DESC = ", ".join(SUPPORTED_TOOLS)
+
+# Tools that are called without the supplied arguments
+_NO_ARGUMENT_TOOLS = frozenset(("get_thoughts", "clear_thoughts", "get_thought_stats"))
 
 
 async def call_tool(name: str, arguments: Dict[str, Any] = None) -> Dict[str, Any]:
@@ -54,61 +59,19 @@ async def call_tool(name: str, arguments: Dict[str, Any] = None) -> Dict[str, An
     if name not in SUPPORTED_TOOLS:
         return {
             "success": False,
-            "error": f"Tool '{name}' is not supported. Supported tools: {', '.join(SUPPORTED_TOOLS)}",
+            "error": f"Tool '{name}' is not supported. Supported tools: {_SUPPORTED_TOOLS_DESC}",
         }
 
-    # Map between underscore and hyphen formats if needed
-    tool_name_mapping = {
-        "get_project_settings": "get-project-settings",
-        "initialize_ide": "initialize-ide",
-        "initialize_ide_rules": "initialize-ide-rules",
-        "prime_context": "prime-context",
-        "migrate_mcp_config": "migrate-mcp-config",
-        "think": "think",
-        "get_thoughts": "get-thoughts",
-        "clear_thoughts": "clear-thoughts",
-        "get_thought_stats": "get-thought-stats",
-    }
-
-    # Convert to hyphen format for FastMCP tools
-    fastmcp_tool_name = tool_name_mapping.get(name, name)
-
     # Call the appropriate function from fastmcp_tools
     try:
-        # Import tools only when needed to avoid circular imports
-        from .fastmcp_tools import (
-            get_project_settings,
-            initialize_ide,
-            initialize_ide_rules,
-            prime_context,
-            migrate_mcp_config,
-            think,
-            get_thoughts,
-            clear_thoughts,
-            get_thought_stats,
-        )
-
-        # Call the appropriate function based on the tool name
-        if fastmcp_tool_name == "get-project-settings":
-            result = get_project_settings(**arguments)
-        elif fastmcp_tool_name == "initialize-ide":
-            result = initialize_ide(**arguments)
-        elif fastmcp_tool_name == "initialize-ide-rules":
-            result = initialize_ide_rules(**arguments)
-        elif fastmcp_tool_name == "prime-context":
-            result = prime_context(**arguments)
-        elif fastmcp_tool_name == "migrate-mcp-config":
-            result = migrate_mcp_config(**arguments)
-        elif fastmcp_tool_name == "think":
-            result = think(**arguments)
-        elif fastmcp_tool_name == "get-thoughts":
-            result = get_thoughts()
-        elif fastmcp_tool_name == "clear-thoughts":
-            result = clear_thoughts()
-        elif fastmcp_tool_name == "get-thought-stats":
-            result = get_thought_stats()
-        else:
+        # Import tools only when needed to avoid circular imports. The natural-language
+        # dispatch table lists every tool call_tool can run.
+        from .fastmcp_tools import _NL_TOOL_DISPATCH
+
+        tool = _NL_TOOL_DISPATCH.get(name)
+        if tool is None:
             raise ValueError(f"Unknown tool: {name}")
+        result = tool() if name in _NO_ARGUMENT_TOOLS else tool(**arguments)
 
         if asyncio.iscoroutine(result):
             result = await result
@@ -120,7 +83,7 @@ async def call_tool(name: str, arguments: Dict[str, Any] = None) -> Dict[str, An
         elif isinstance(result, str):
             # Try to parse JSON string
             try:
-                return json.loads(result)
+                return loads_json(result)
             except json.JSONDecodeError as e:
                 return {
                     "success": False,
@@ -89,7 +89,7 @@ def main(debug: bool = False, quiet: bool = True, verbose: bool = False) -> Opti
         return 0
     except Exception as e:
         if not quiet:
-            logging.error(f"Server error: {str(e)}")
+            logging.error("Server error: %s", e)
         return 1
 
 
@@ -117,15 +117,8 @@ if __name__ == "__main__":
         print(f"MCP Agile Flow v{__version__}")
         sys.exit(0)
 
-    if args.server:
-        # Run as server
-        from .server import start_server
-
-        start_server()
-    else:
-        # Run the server and exit with the returned code if any
-        exit_code = main(
-            debug=args.debug, quiet=not (args.debug or args.verbose), verbose=args.verbose
-        )
-        if exit_code is not None:
-            sys.exit(exit_code)
+    # Run the server and exit with the returned code if any. --server is kept for
+    # backwards compatibility; the FastMCP server is what always runs.
+    exit_code = main(debug=args.debug, quiet=not (args.debug or args.verbose), verbose=args.verbose)
+    if exit_code is not None:
+        sys.exit(exit_code)
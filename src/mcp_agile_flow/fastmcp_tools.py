@@ -4,11 +4,14 @@ FastMCP tool implementations.
 """
 
 import datetime
+import functools
 import os
-import json
 import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional, Dict, Any, List
+from typing import Annotated, Callable, Optional, Dict, Any, List
 
 # Import from mcp directly
 from mcp.server.fastmcp import FastMCP
@@ -18,16 +21,17 @@ from pydantic import Field
 from .migration_tool import IDE_PATHS, migrate_config
 
 # Import models and utilities
-from .utils import get_project_settings as get_settings_util, detect_mcp_command
-from .think_tool import think as think_impl
-from .think_tool import get_thoughts as get_thoughts_impl
-from .think_tool import clear_thoughts as clear_thoughts_impl
-from .think_tool import get_thought_stats as get_thought_stats_impl
-from .think_tool import detect_thinking_directive as detect_thinking_directive_impl
-from .think_tool import think_more as think_more_impl
-from .think_tool import should_think as should_think_impl
+from .utils import (
+    get_project_settings as get_settings_util,
+    detect_mcp_command,
+    dumps_json,
+)
 from .initialize_ide_rules import initialize_ide_rules as initialize_ide_rules_impl
 
+# The thought tools import think_tool on first call: importing it creates the
+# temporary thought storage file, which a server that never records thoughts
+# does not need.
+
 # Configure logger
 logger = logging.getLogger(__name__)
 
@@ -44,11 +48,319 @@ VALID_IDE_RULES = {
     "roo": ".clinerules",
     "copilot": ".github/copilot-instructions.md",
 }
+# Comma-separated IDE names for tool descriptions and error messages
+_VALID_IDE_RULES_DESC = ", ".join(VALID_IDE_RULES)
+_MCP_IDE_PATHS_DESC = ", ".join(MCP_IDE_PATHS)
+# Directory each IDE's rules path lives in, relative to the project ("" for the root)
+_IDE_RULES_PARENT_DIRS = {ide: os.path.dirname(path) for ide, path in VALID_IDE_RULES.items()}
+# Pre-encoded headers for the single-file rules written by initialize_ide
+_RULES_FILE_HEADERS = {ide: f"# {ide.title()} Rules\n".encode() for ide in VALID_IDE_RULES}
+# Default cursor rules created by initialize_ide, pre-encoded for os.write
+_DEFAULT_CURSOR_RULES = (
+    (
+        "001-project-basics.md",
+        b"# Project Structure\n\n- Follow the existing project structure\n- Document new components\n- Keep related files together",
+    ),
+    (
+        "002-code-guidelines.md",
+        b"# Coding Standards\n\n- Follow PEP 8 for Python code\n- Write tests for all new features\n- Document public functions and classes",
+    ),
+    (
+        "003-best-practices.md",
+        b"# Best Practices\n\n- Review code before submitting\n- Handle errors gracefully\n- Use meaningful variable and function names",
+    ),
+)
+
+# Resolved project settings keyed by (proposed_path, PROJECT_PATH, cwd). Each entry
+# stores a stat fingerprint of the paths project detection depends on, so a hit is
+# only served while nothing relevant on disk has changed. The TTL bounds staleness
+# for state the fingerprint cannot see, such as permission changes.
+_SETTINGS_CACHE_TTL = 30.0
+_SETTINGS_CACHE_SIZE = 64
+_settings_cache: Dict[tuple, tuple] = {}
+_settings_cache_lock = threading.Lock()
+
+
+def _settings_fingerprint(project_path: str, requested_path: Optional[str]) -> tuple:
+    """Collect the mtimes that decide the outcome of get_settings_util."""
+    paths = [
+        project_path,
+        os.path.join(project_path, ".cursor"),
+        os.path.join(project_path, ".github"),
+    ]
+    # A requested path that fell back to the cwd becomes valid once it is created
+    if requested_path and requested_path != project_path:
+        paths.append(requested_path)
+
+    fingerprint = []
+    for path in paths:
+        try:
+            fingerprint.append(os.stat(path).st_mtime_ns)
+        except OSError:
+            fingerprint.append(None)
+    return tuple(fingerprint)
+
+
+def _cached_settings(proposed_path: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Return get_settings_util results, reusing them while the project is unchanged.
+
+    The returned dictionary is shared between callers and must not be mutated.
+    """
+    env_path = os.environ.get("PROJECT_PATH")
+    key = (proposed_path, env_path, os.getcwd())
+    requested_path = proposed_path or env_path
+    now = time.monotonic()
+
+    with _settings_cache_lock:
+        entry = _settings_cache.get(key)
+    if entry is not None:
+        expires_at, fingerprint, settings = entry
+        if (
+            now < expires_at
+            and _settings_fingerprint(settings["project_path"], requested_path) == fingerprint
+        ):
+            return settings
+
+    settings = get_settings_util(proposed_path)
+    fingerprint = _settings_fingerprint(settings["project_path"], requested_path)
+    with _settings_cache_lock:
+        _settings_cache.pop(key, None)
+        for stale_key in [k for k, v in _settings_cache.items() if v[0] <= now]:
+            del _settings_cache[stale_key]
+        if len(_settings_cache) >= _SETTINGS_CACHE_SIZE:
+            # Evict the least recently stored path
+            del _settings_cache[next(iter(_settings_cache))]
+        _settings_cache[key] = (now + _SETTINGS_CACHE_TTL, fingerprint, settings)
+    return settings
+
+
+def clear_settings_cache() -> None:
+    """Drop all cached project settings, e.g. after a tool changed the project tree."""
+    with _settings_cache_lock:
+        _settings_cache.clear()
+
+
+# Analysis depths accepted by prime_context
+_VALID_DEPTHS = frozenset(("minimal", "standard", "deep"))
+
+# Focus areas read by prime_context, keyed by ai-docs directory. Each entry stores the
+# (name, size, mtime) of every markdown document it was built from, so the documents
+# are only read again after one of them is added, removed or modified.
+_FOCUS_AREA_CACHE_SIZE = 32
+# Documents are embedded in the prime_context response, so cap how much of each is read
+_MAX_DOCUMENT_CHARS = 512 * 1024
+_focus_area_cache: Dict[str, tuple] = {}
+_focus_area_cache_lock = threading.Lock()
+# Below this many documents, starting pool work costs more than reading them in turn
+_PARALLEL_READ_MIN_DOCUMENTS = 8
+_read_pool: Optional[ThreadPoolExecutor] = None
+_read_pool_lock = threading.Lock()
+
+
+def _read_focus_area(doc_path: str, size: int) -> Optional[Dict[str, Any]]:
+    """Read one ai-docs document into a focus area, or None if it cannot be read."""
+    if size == 0:
+        # The size comes from the directory scan, so an empty document needs no open
+        content = ""
+    else:
+        try:
+            with open(doc_path, "r") as f:
+                # Read one character past the cap to detect truncation
+                content = f.read(_MAX_DOCUMENT_CHARS + 1)
+        except (OSError, UnicodeDecodeError) as e:
+            logger.warning("Error reading document %s: %s", doc_path, e)
+            return None
+
+    truncated = len(content) > _MAX_DOCUMENT_CHARS
+    if truncated:
+        content = content[:_MAX_DOCUMENT_CHARS]
+    # Documents are filtered on the .md suffix, so the stem is the name minus three chars
+    stem = os.path.basename(doc_path)[:-3]
+    return {
+        "type": stem,
+        "path": doc_path,
+        "name": stem.title(),
+        "content": content,  # Include the actual file content
+        "truncated": truncated,
+    }
+
+
+def _get_read_pool() -> ThreadPoolExecutor:
+    """Create the shared document read pool on first use."""
+    global _read_pool
+    with _read_pool_lock:
+        if _read_pool is None:
+            _read_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="ai-docs-read")
+        return _read_pool
+
+
+def _read_focus_areas(ai_docs_dir: str) -> List[Dict[str, Any]]:
+    """
+    Read the markdown documents in ai_docs_dir, reusing them while none has changed.
+
+    A missing ai_docs_dir yields no documents. The returned list is shared between
+    callers and must not be mutated.
+    """
+    try:
+        with os.scandir(ai_docs_dir) as entries:
+            doc_entries = [
+                entry for entry in entries if entry.name.endswith(".md") and entry.is_file()
+            ]
+    except (FileNotFoundError, NotADirectoryError):
+        return []
+    doc_paths = []
+    doc_stats = []
+    for entry in doc_entries:
+        try:
+            doc_stat = entry.stat()
+        except OSError as e:
+            # e.g. deleted since the scan; skip just this document
+            logger.warning("Error reading document %s: %s", entry.path, e)
+            continue
+        doc_paths.append(entry.path)
+        doc_stats.append((entry.name, doc_stat.st_size, doc_stat.st_mtime_ns))
+    fingerprint = tuple(doc_stats)
+
+    with _focus_area_cache_lock:
+        cached = _focus_area_cache.get(ai_docs_dir)
+    if cached is not None and cached[0] == fingerprint:
+        return cached[1]
+
+    doc_sizes = [size for _, size, _ in fingerprint]
+    if len(doc_paths) >= _PARALLEL_READ_MIN_DOCUMENTS:
+        # Reads release the GIL, so a pool overlaps their I/O latency
+        results = _get_read_pool().map(_read_focus_area, doc_paths, doc_sizes)
+    else:
+        results = map(_read_focus_area, doc_paths, doc_sizes)
+    focus_areas = [area for area in results if area is not None]
+
+    with _focus_area_cache_lock:
+        _focus_area_cache.pop(ai_docs_dir, None)
+        if len(_focus_area_cache) >= _FOCUS_AREA_CACHE_SIZE:
+            # Evict the least recently stored directory
+            del _focus_area_cache[next(iter(_focus_area_cache))]
+        _focus_area_cache[ai_docs_dir] = (fingerprint, focus_areas)
+    return focus_areas
+
+
+def _write_bytes(path: str, data: bytes) -> None:
+    """Write a small payload with raw os calls, truncating any existing file."""
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        os.write(fd, data)
+    finally:
+        os.close(fd)
+
+
+def _create_bytes(path: str, data: bytes) -> bool:
+    """
+    Write a small payload to a new file, leaving any existing file untouched.
+
+    O_EXCL makes the existence check part of the open, so no separate stat is
+    needed. Returns False if the file already existed.
+    """
+    try:
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+    except FileExistsError:
+        return False
+    try:
+        os.write(fd, data)
+    finally:
+        os.close(fd)
+    return True
+
+
+# Set MCP_AGILE_FLOW_PRETTY_JSON=1 to indent tool responses when debugging by hand
+_PRETTY_JSON = os.environ.get("MCP_AGILE_FLOW_PRETTY_JSON") == "1"
+
+
+def _dumps(obj: Any) -> str:
+    """Serialize a tool response; compact by default since clients parse it."""
+    return dumps_json(obj, pretty=_PRETTY_JSON)
+
+
+def _error_response(error: str, message: str, **fields: Any) -> str:
+    """Serialize a failed tool response."""
+    return _dumps({"success": False, "error": error, "message": message, **fields})
+
+
+# Shared by every response that rejects the project path
+_INVALID_PATH_MESSAGE = (
+    "Please provide a valid project path. You can look up project path and try again."
+)
+
+# Rejecting "/" in get_project_settings does not depend on any input, so the
+# response is serialized once at import
+_ROOT_PATH_ERROR = {
+    "success": False,
+    "error": "Root path is not allowed for safety reasons",
+    "message": _INVALID_PATH_MESSAGE,
+    "project_path": None,
+    "source": "fallback from rejected root path",
+    "is_root": True,
+}
+_ROOT_PATH_ERROR_JSON = _dumps(_ROOT_PATH_ERROR)
+
+
+@functools.lru_cache(maxsize=64)
+def _unknown_ide_rules_response(ide: str) -> str:
+    """Serialize initialize_ide_rules' rejection of an unsupported IDE."""
+    return _error_response(
+        f"Unknown IDE type: {ide}",
+        f"Supported IDE types for rules are: {_VALID_IDE_RULES_DESC}",
+        project_path=None,
+    )
+
 
 # Create FastMCP instance
 mcp = FastMCP("mcp_agile_flow")
 
 
+def _resolve_project_settings(proposed_path: Optional[str]) -> Dict[str, Any]:
+    """
+    Build the get_project_settings response as a dictionary.
+
+    Tools that need the settings themselves call this directly rather than
+    parsing the JSON returned by the get_project_settings tool.
+    """
+    # Handle potentially invalid paths (incorrect types, etc.)
+    if proposed_path is not None and not isinstance(proposed_path, str):
+        proposed_path = None  # This will trigger using the current directory
+
+    # Handle potentially unsafe paths
+    if proposed_path == "/":
+        return dict(_ROOT_PATH_ERROR)
+
+    try:
+        # Get project path and settings
+        project_settings = _cached_settings(proposed_path)
+
+        # Return with success flag
+        return {
+            "success": True,
+            "project_path": project_settings["project_path"],
+            "current_directory": project_settings["current_directory"],
+            "is_project_path_manually_set": project_settings["is_project_path_manually_set"],
+            "ai_docs_directory": project_settings["ai_docs_directory"],
+            "source": project_settings["source"],
+            "is_root": project_settings["is_root"],
+            "is_writable": project_settings["is_writable"],
+            "exists": project_settings["exists"],
+            "project_type": project_settings["project_type"],
+            "rules": project_settings["rules"],
+            "project_metadata": {},  # Add empty project_metadata as expected by tests
+        }
+    except Exception as e:
+        return {
+            "success": False,
+            "error": str(e),
+            "message": _INVALID_PATH_MESSAGE,
+            "project_path": None,
+            "source": "error fallback",
+        }
+
+
 # Tool implementations
 @mcp.tool()
 def get_project_settings(
@@ -60,61 +372,10 @@ def get_project_settings(
     Returns configuration settings including project path, type, and metadata.
     If proposed_path is not provided or invalid, uses the current directory.
     """
-    try:
-        # Extract actual value if it's a Field object
-        if hasattr(proposed_path, "default"):
-            proposed_path = proposed_path.default
-
-        # Handle potentially invalid paths (incorrect types, etc.)
-        if proposed_path is not None and not isinstance(proposed_path, str):
-            proposed_path = None  # This will trigger using the current directory
-
-        # Handle potentially unsafe paths
-        if proposed_path == "/":
-            return json.dumps(
-                {
-                    "success": False,
-                    "error": "Root path is not allowed for safety reasons",
-                    "message": "Please provide a valid project path. You can look up project path and try again.",
-                    "project_path": None,
-                    "source": "fallback from rejected root path",
-                    "is_root": True,
-                },
-                indent=2,
-            )
-
-        # Get project path and settings
-        project_settings = get_settings_util(proposed_path)
+    if proposed_path == "/":
+        return _ROOT_PATH_ERROR_JSON
 
-        # Return with success flag
-        return json.dumps(
-            {
-                "success": True,
-                "project_path": project_settings["project_path"],
-                "current_directory": project_settings["current_directory"],
-                "is_project_path_manually_set": project_settings["is_project_path_manually_set"],
-                "ai_docs_directory": project_settings["ai_docs_directory"],
-                "source": project_settings["source"],
-                "is_root": project_settings["is_root"],
-                "is_writable": project_settings["is_writable"],
-                "exists": project_settings["exists"],
-                "project_type": project_settings["project_type"],
-                "rules": project_settings["rules"],
-                "project_metadata": {},  # Add empty project_metadata as expected by tests
-            },
-            indent=2,
-        )
-    except Exception as e:
-        return json.dumps(
-            {
-                "success": False,
-                "error": str(e),
-                "message": "Please provide a valid project path. You can look up project path and try again.",
-                "project_path": None,
-                "source": "error fallback",
-            },
-            indent=2,
-        )
+    return _dumps(_resolve_project_settings(proposed_path))
 
 
 @mcp.tool()
@@ -133,33 +394,21 @@ def think(
     Thoughts can be organized by category and depth to create a hierarchical structure
     of analysis.
     """
-    # Extract actual values if they're Field objects
-    if hasattr(thought, "default"):
-        thought = thought.default
-    if hasattr(category, "default"):
-        category = category.default
-    if hasattr(depth, "default"):
-        depth = depth.default
-    if hasattr(timestamp, "default"):
-        timestamp = timestamp.default
-    if hasattr(references, "default"):
-        references = references.default
-    if hasattr(metadata, "default"):
-        metadata = metadata.default
+    from .think_tool import think as think_impl
 
     result = think_impl(thought, category, depth, None)
-    # Convert dict to formatted JSON string
-    return json.dumps(result, indent=2)
+    # Convert dict to JSON string
+    return _dumps(result)
 
 
 @mcp.tool()
 def get_thoughts(
-    category: Optional[str] = Field(
-        description="Filter to get thoughts from a specific category", default=None
-    ),
-    organize_by_depth: bool = Field(
-        description="Whether to organize thoughts by depth relationships", default=False
-    ),
+    category: Annotated[
+        Optional[str], Field(description="Filter to get thoughts from a specific category")
+    ] = None,
+    organize_by_depth: Annotated[
+        bool, Field(description="Whether to organize thoughts by depth relationships")
+    ] = False,
 ) -> str:
     """
     Retrieve recorded thoughts.
@@ -167,21 +416,17 @@ def get_thoughts(
     This tool retrieves all previously recorded thoughts, optionally filtered by category.
     You can also choose to organize them hierarchically by depth.
     """
-    # Extract actual values if they're Field objects
-    if hasattr(category, "default"):
-        category = category.default
-    if hasattr(organize_by_depth, "default"):
-        organize_by_depth = organize_by_depth.default
+    from .think_tool import get_thoughts as get_thoughts_impl
 
     result = get_thoughts_impl(category, organize_by_depth)
-    return json.dumps(result, indent=2)
+    return _dumps(result)
 
 
 @mcp.tool()
 def clear_thoughts(
-    category: Optional[str] = Field(
-        description="Filter to clear thoughts from a specific category only", default=None
-    ),
+    category: Annotated[
+        Optional[str], Field(description="Filter to clear thoughts from a specific category only")
+    ] = None,
 ) -> str:
     """
     Clear recorded thoughts.
@@ -189,19 +434,17 @@ def clear_thoughts(
     This tool removes previously recorded thoughts, optionally filtered by category.
     If no category is specified, all thoughts will be cleared.
     """
-    # Extract actual value if it's a Field object
-    if hasattr(category, "default"):
-        category = category.default
+    from .think_tool import clear_thoughts as clear_thoughts_impl
 
     result = clear_thoughts_impl(category)
-    return json.dumps(result, indent=2)
+    return _dumps(result)
 
 
 @mcp.tool()
 def get_thought_stats(
-    category: Optional[str] = Field(
-        description="Filter to get stats for a specific category", default=None
-    ),
+    category: Annotated[
+        Optional[str], Field(description="Filter to get stats for a specific category")
+    ] = None,
 ) -> str:
     """
     Get statistics about recorded thoughts.
@@ -209,17 +452,15 @@ def get_thought_stats(
     This tool provides statistics about recorded thoughts, such as count and
     depth distribution. Results can be filtered by category.
     """
-    # Extract actual value if it's a Field object
-    if hasattr(category, "default"):
-        category = category.default
+    from .think_tool import get_thought_stats as get_thought_stats_impl
 
     result = get_thought_stats_impl(category)
-    return json.dumps(result, indent=2)
+    return _dumps(result)
 
 
 @mcp.tool()
 def detect_thinking_directive(
-    text: str = Field(description="The text to analyze for thinking directives"),
+    text: Annotated[str, Field(description="The text to analyze for thinking directives")],
 ) -> str:
     """
     Detect thinking directives.
@@ -227,17 +468,15 @@ def detect_thinking_directive(
     This tool analyzes text to detect directives suggesting deeper thinking,
     such as "think harder", "think deeper", "think again", etc.
     """
-    # Extract actual value if it's a Field object
-    if hasattr(text, "default"):
-        text = text.default
+    from .think_tool import detect_thinking_directive as detect_thinking_directive_impl
 
     result = detect_thinking_directive_impl(text)
-    return json.dumps(result, indent=2)
+    return _dumps(result)
 
 
 @mcp.tool()
 def should_think(
-    query: str = Field(description="The query to assess for deep thinking requirements"),
+    query: Annotated[str, Field(description="The query to assess for deep thinking requirements")],
 ) -> str:
     """
     Assess whether deeper thinking is needed for a query.
@@ -245,40 +484,39 @@ def should_think(
     This tool analyzes a query to determine if it requires deeper thinking,
     based on complexity indicators and context.
     """
-    # Extract actual value if it's a Field object
-    if hasattr(query, "default"):
-        query = query.default
+    from .think_tool import should_think as should_think_impl
 
     result = should_think_impl(query)
-    return json.dumps(result, indent=2)
+    return _dumps(result)
 
 
 @mcp.tool()
-def think_more(query: str = Field(description="The query to think more deeply about")) -> str:
+def think_more(
+    query: Annotated[str, Field(description="The query to think more deeply about")],
+) -> str:
     """
     Get guidance for thinking more deeply.
 
     This tool provides suggestions and guidance for thinking more deeply
     about a specific query or thought.
     """
-    # Extract actual value if it's a Field object
-    if hasattr(query, "default"):
-        query = query.default
+    from .think_tool import think_more as think_more_impl
 
     result = think_more_impl(query, None)
-    return json.dumps(result, indent=2)
+    return _dumps(result)
 
 
 @mcp.tool()
 def initialize_ide(
-    project_path: Optional[str] = Field(
-        description="Path to the project. If not provided, invalid, or directory doesn't exist, the current working directory will be used automatically",
-        default=None,
-    ),
-    ide_type: str = Field(
-        description=f"The type of IDE to initialize ({', '.join(VALID_IDE_RULES.keys())})",
-        default="cursor",
-    ),
+    project_path: Annotated[
+        Optional[str],
+        Field(
+            description="Path to the project. If not provided, invalid, or directory doesn't exist, the current working directory will be used automatically"
+        ),
+    ] = None,
+    ide_type: Annotated[
+        str, Field(description=f"The type of IDE to initialize ({_VALID_IDE_RULES_DESC})")
+    ] = "cursor",
 ) -> str:
     """
     Initialize IDE project structure with appropriate directories and config files.
@@ -289,26 +527,15 @@ def initialize_ide(
     Note: If project_path is omitted, not a string, invalid, or the directory doesn't exist,
     the current working directory will be used automatically.
     """
-    # Extract actual values if they're Field objects
-    if hasattr(project_path, "default"):
-        project_path = project_path.default
-    if hasattr(ide_type, "default"):
-        ide_type = ide_type.default
-
     # Get project settings first to ensure we have a valid path
-    settings_json = get_project_settings(proposed_path=project_path)
-    settings = json.loads(settings_json)
+    settings = _resolve_project_settings(project_path)
 
     if not settings["success"]:
-        return json.dumps(
-            {
-                "success": False,
-                "project_path": None,
-                "templates_directory": "",
-                "error": settings["error"] if "error" in settings else "Invalid project path",
-                "message": "Please provide a valid project path. You can look up project path and try again.",
-            },
-            indent=2,
+        return _error_response(
+            settings.get("error", "Invalid project path"),
+            _INVALID_PATH_MESSAGE,
+            project_path=None,
+            templates_directory="",
         )
 
     # Use the validated project path from settings
@@ -318,15 +545,11 @@ def initialize_ide(
     project_type = ide_type.lower() if ide_type else settings["project_type"]
 
     if project_type not in VALID_IDE_RULES:
-        return json.dumps(
-            {
-                "success": False,
-                "project_path": project_path,
-                "templates_directory": "",
-                "error": f"Unknown IDE type: {project_type}",
-                "message": f"Supported IDE types are: {', '.join(VALID_IDE_RULES.keys())}",
-            },
-            indent=2,
+        return _error_response(
+            f"Unknown IDE type: {project_type}",
+            f"Supported IDE types are: {_VALID_IDE_RULES_DESC}",
+            project_path=project_path,
+            templates_directory="",
         )
 
     try:
@@ -340,17 +563,8 @@ def initialize_ide(
             os.makedirs(rules_dir, exist_ok=True)
 
             # Create default markdown files
-            default_files = {
-                "001-project-basics.md": "# Project Structure\n\n- Follow the existing project structure\n- Document new components\n- Keep related files together",
-                "002-code-guidelines.md": "# Coding Standards\n\n- Follow PEP 8 for Python code\n- Write tests for all new features\n- Document public functions and classes",
-                "003-best-practices.md": "# Best Practices\n\n- Review code before submitting\n- Handle errors gracefully\n- Use meaningful variable and function names",
-            }
-
-            for filename, content in default_files.items():
-                file_path = os.path.join(rules_dir, filename)
-                if not os.path.exists(file_path):
-                    with open(file_path, "w") as f:
-                        f.write(content)
+            for filename, content in _DEFAULT_CURSOR_RULES:
+                _create_bytes(os.path.join(rules_dir, filename), content)
 
             rules_location = rules_dir
         else:
@@ -358,51 +572,45 @@ def initialize_ide(
             rules_file = os.path.join(project_path, VALID_IDE_RULES[project_type])
 
             # Create parent directory if needed (e.g., for .github)
-            if "/" in VALID_IDE_RULES[project_type]:
-                os.makedirs(
-                    os.path.dirname(os.path.join(project_path, VALID_IDE_RULES[project_type])),
-                    exist_ok=True,
-                )
-
-            with open(rules_file, "w") as f:
-                f.write(f"# {project_type.title()} Rules\n")
+            parent_dir = _IDE_RULES_PARENT_DIRS[project_type]
+            if parent_dir:
+                os.makedirs(os.path.join(project_path, parent_dir), exist_ok=True)
+
+            _write_bytes(rules_file, _RULES_FILE_HEADERS[project_type])
             rules_location = rules_file
 
-        return json.dumps(
+        clear_settings_cache()
+        return _dumps(
             {
                 "success": True,
                 "project_path": project_path,
-                "templates_directory": os.path.join(project_path, ".ai-templates"),
+                "templates_directory": templates_dir,
                 "rules_directory": rules_location if project_type == "cursor" else None,
                 "rules_file": rules_location if project_type != "cursor" else None,
                 "message": f"Initialized {project_type} project in {project_path}",
                 "initialized_rules": True,
-            },
-            indent=2,
+            }
         )
     except Exception as e:
-        return json.dumps(
-            {
-                "success": False,
-                "project_path": project_path,
-                "templates_directory": "",
-                "error": str(e),
-                "message": "Please provide a valid project path. You can look up project path and try again.",
-            },
-            indent=2,
+        return _error_response(
+            str(e),
+            _INVALID_PATH_MESSAGE,
+            project_path=project_path,
+            templates_directory="",
         )
 
 
 @mcp.tool()
 def initialize_ide_rules(
-    ide: str = Field(
-        description=f"The IDE to initialize rules for ({', '.join(VALID_IDE_RULES.keys())})",
-        default="cursor",
-    ),
-    project_path: Optional[str] = Field(
-        description="Path to the project. If not provided or invalid, the current working directory will be used automatically",
-        default=None,
-    ),
+    ide: Annotated[
+        str, Field(description=f"The IDE to initialize rules for ({_VALID_IDE_RULES_DESC})")
+    ] = "cursor",
+    project_path: Annotated[
+        Optional[str],
+        Field(
+            description="Path to the project. If not provided or invalid, the current working directory will be used automatically"
+        ),
+    ] = None,
 ) -> str:
     """
     Initialize IDE rules for a project.
@@ -413,43 +621,22 @@ def initialize_ide_rules(
     Note: If project_path is omitted, not a string, or invalid, the current working
     directory will be used automatically.
     """
-    # Extract the actual value from the project_path if it's a Field
-    if hasattr(project_path, "default"):
-        project_path = project_path.default
-
     # Handle potentially invalid paths (empty strings, incorrect types, etc.)
     if project_path is not None and not isinstance(project_path, str):
         project_path = None  # This will trigger using the current directory
 
-    # Extract the actual value from ide if it's a Field
-    if hasattr(ide, "default"):
-        ide = ide.default
-
     # Validate IDE type
     if ide not in VALID_IDE_RULES:
-        return json.dumps(
-            {
-                "success": False,
-                "error": f"Unknown IDE type: {ide}",
-                "message": f"Supported IDE types for rules are: {', '.join(VALID_IDE_RULES.keys())}",
-                "project_path": None,
-            },
-            indent=2,
-        )
+        return _unknown_ide_rules_response(ide)
 
-    # Get project settings and parse the JSON response
-    settings_json = get_project_settings(proposed_path=project_path)
-    settings = json.loads(settings_json)
+    # Get project settings to ensure we have a valid path
+    settings = _resolve_project_settings(project_path)
 
     if not settings["success"]:
-        return json.dumps(
-            {
-                "success": False,
-                "error": settings.get("error", "Failed to get project settings"),
-                "message": "Please provide a valid project path. You can look up project path and try again.",
-                "project_path": None,
-            },
-            indent=2,
+        return _error_response(
+            settings.get("error", "Failed to get project settings"),
+            _INVALID_PATH_MESSAGE,
+            project_path=None,
         )
 
     actual_project_path = settings["project_path"]
@@ -457,28 +644,27 @@ def initialize_ide_rules(
     try:
         # Call the specialized implementation and format the result
         result = initialize_ide_rules_impl(ide=ide, project_path=actual_project_path)
-        return json.dumps(result, indent=2)
+        clear_settings_cache()
+        return _dumps(result)
     except Exception as e:
-        return json.dumps(
-            {
-                "success": False,
-                "error": str(e),
-                "message": "Please provide a valid project path. You can look up project path and try again.",
-                "project_path": None,
-            },
-            indent=2,
+        return _error_response(
+            str(e),
+            _INVALID_PATH_MESSAGE,
+            project_path=None,
         )
 
 
 @mcp.tool()
 def prime_context(
-    project_path: Optional[str] = Field(
-        description="Path to the project. If not provided or invalid, the current working directory will be used automatically",
-        default=None,
-    ),
-    depth: str = Field(
-        description="Depth of analysis (minimal, standard, deep)", default="standard"
-    ),
+    project_path: Annotated[
+        Optional[str],
+        Field(
+            description="Path to the project. If not provided or invalid, the current working directory will be used automatically"
+        ),
+    ] = None,
+    depth: Annotated[
+        str, Field(description="Depth of analysis (minimal, standard, deep)")
+    ] = "standard",
 ) -> str:
     """
     Prime project context by analyzing documentation and structure.
@@ -490,57 +676,38 @@ def prime_context(
     directory will be used automatically.
     """
     # Validate depth parameter
-    valid_depths = ["minimal", "standard", "deep"]
-    if depth not in valid_depths:
+    if not isinstance(depth, str) or depth not in _VALID_DEPTHS:
+        logger.warning("Invalid depth '%s', defaulting to 'standard'", depth)
         depth = "standard"
-        logger.warning(f"Invalid depth '{depth}', defaulting to 'standard'")
-
-    # Extract the actual values if they're Field objects
-    if hasattr(project_path, "default"):
-        project_path = project_path.default
-    if hasattr(depth, "default"):
-        depth = depth.default
 
     # Handle potentially invalid paths (incorrect types, etc.)
     if project_path is not None and not isinstance(project_path, str):
         project_path = None  # This will trigger using the current directory
 
-    settings = get_settings_util(proposed_path=project_path)
+    settings = _cached_settings(project_path)
     actual_project_path = settings["project_path"]
 
-    logger.info(f"Building context structure for {actual_project_path} with depth {depth}...")
+    logger.info("Building context structure for %s with depth %s...", actual_project_path, depth)
 
     # Create the context structure with all required fields
+    project_info = {
+        "name": os.path.basename(actual_project_path),
+        "path": actual_project_path,
+        "type": settings.get("project_type", "generic"),
+        "location": {"path": actual_project_path},
+    }
     context = {
-        "project": {
-            "name": os.path.basename(actual_project_path),
-            "path": actual_project_path,
-            "type": settings.get("project_type", "generic"),
-            "location": {"path": actual_project_path},
-        },
+        "project": project_info,
         "depth": depth,
         "focus_areas": [],
     }
 
     try:
-
         # Scan for documents in the ai-docs directory
         ai_docs_dir = settings.get("ai_docs_directory")
-        if ai_docs_dir and os.path.exists(ai_docs_dir):
-            for doc_file in Path(ai_docs_dir).glob("*.md"):
-                try:
-                    with open(doc_file, "r") as f:
-                        content = f.read()
-                    context["focus_areas"].append(
-                        {
-                            "type": doc_file.stem,
-                            "path": str(doc_file),
-                            "name": doc_file.stem.title(),
-                            "content": content,  # Include the actual file content
-                        }
-                    )
-                except Exception as e:
-                    logger.warning(f"Error reading document {doc_file}: {str(e)}")
+        if ai_docs_dir:
+            # Copy, since the minimal-depth default below appends to this list
+            context["focus_areas"] = list(_read_focus_areas(ai_docs_dir))
 
         # Ensure we have at least one focus area for minimal depth
         if depth == "minimal" and not context["focus_areas"]:
@@ -553,34 +720,8 @@ def prime_context(
                 }
             )
 
-        # Ensure we have all required fields
-        if not context.get("focus_areas"):
-            context["focus_areas"] = []
-
-        # Always include project info
-        context["project"] = {
-            "name": os.path.basename(actual_project_path),
-            "path": actual_project_path,
-            "type": settings.get("project_type", "generic"),
-            "location": {"path": actual_project_path},
-        }
-        context["depth"] = depth
-
         logger.info("Context built successfully")
 
-        # Ensure we have at least one focus area for minimal depth
-        if depth == "minimal" and not context["focus_areas"]:
-            context["focus_areas"].append(
-                {
-                    "type": "general",
-                    "path": str(
-                        Path(settings.get("ai_docs_directory", actual_project_path)) / "overview.md"
-                    ),
-                    "name": "Project Overview",
-                    "content": f"Default project overview for {context['project']['name']}",
-                }
-            )
-
         # Convert to expected response format
         response = {
             "success": True,
@@ -591,42 +732,36 @@ def prime_context(
             "timestamp": datetime.datetime.now().isoformat(),
         }
 
-        return json.dumps(response, indent=2)
+        return _dumps(response)
     except Exception as e:
-        logger.error(f"Error building context: {str(e)}")
-        return json.dumps(
+        logger.error("Error building context: %s", e)
+        return _dumps(
             {
                 "success": False,
                 "error": f"Failed to build context: {str(e)}",
                 "context": {
-                    "project": {
-                        "name": os.path.basename(actual_project_path),
-                        "path": actual_project_path,
-                        "type": settings.get("project_type", "generic"),
-                        "location": {"path": actual_project_path},
-                    },
+                    "project": project_info,
                     "depth": depth,
                     "focus_areas": [],
                 },
-            },
-            indent=2,
+            }
         )
 
 
 @mcp.tool()
 def migrate_mcp_config(
-    project_path: Optional[str] = Field(
-        description="Path to the project. If not provided or invalid, the current working directory will be used",
-        default=None,
-    ),
-    from_ide: str = Field(
-        description=f"Source IDE to migrate from. Valid options: {', '.join(MCP_IDE_PATHS.keys())}",
-        default="cursor",
-    ),
-    to_ide: str = Field(
-        description=f"Target IDE to migrate to. Valid options: {', '.join(MCP_IDE_PATHS.keys())}",
-        default=None,
-    ),
+    project_path: Annotated[
+        Optional[str],
+        Field(
+            description="Path to the project. If not provided or invalid, the current working directory will be used"
+        ),
+    ] = None,
+    from_ide: Annotated[
+        str, Field(description=f"Source IDE to migrate from. Valid options: {_MCP_IDE_PATHS_DESC}")
+    ] = "cursor",
+    to_ide: Annotated[
+        str, Field(description=f"Target IDE to migrate to. Valid options: {_MCP_IDE_PATHS_DESC}")
+    ] = None,
 ) -> str:
     """
     Migrate MCP configuration between different IDEs.
@@ -637,85 +772,56 @@ def migrate_mcp_config(
     Note: If project_path is omitted, not a string, or invalid, the current working
     directory will be used automatically.
     """
-    # Extract actual values if they're Field objects
-    if hasattr(project_path, "default"):
-        project_path = project_path.default
-    if hasattr(from_ide, "default"):
-        from_ide = from_ide.default
-    if hasattr(to_ide, "default"):
-        to_ide = to_ide.default
-
     # Check if we have a target IDE
     if to_ide is None:
-        return json.dumps(
-            {
-                "success": False,
-                "error": "No target IDE specified",
-                "message": "Please specify a target IDE to migrate to",
-                "project_path": project_path,
-                "from_ide": from_ide,
-                "to_ide": None,
-            },
-            indent=2,
+        return _error_response(
+            "No target IDE specified",
+            "Please specify a target IDE to migrate to",
+            project_path=project_path,
+            from_ide=from_ide,
+            to_ide=None,
         )
 
     # Check if source IDE is valid
     if from_ide not in MCP_IDE_PATHS:
-        return json.dumps(
-            {
-                "success": False,
-                "error": f"Unknown source IDE: {from_ide}",
-                "message": f"Supported IDE types for MCP migration are: {', '.join(MCP_IDE_PATHS.keys())}",
-                "project_path": project_path,
-                "from_ide": from_ide,
-                "to_ide": to_ide,
-            },
-            indent=2,
+        return _error_response(
+            f"Unknown source IDE: {from_ide}",
+            f"Supported IDE types for MCP migration are: {_MCP_IDE_PATHS_DESC}",
+            project_path=project_path,
+            from_ide=from_ide,
+            to_ide=to_ide,
         )
 
     # Check if target IDE is valid
     if to_ide not in MCP_IDE_PATHS:
-        return json.dumps(
-            {
-                "success": False,
-                "error": f"Unknown target IDE: {to_ide}",
-                "message": f"Supported IDE types for MCP migration are: {', '.join(MCP_IDE_PATHS.keys())}",
-                "project_path": project_path,
-                "from_ide": from_ide,
-                "to_ide": to_ide,
-            },
-            indent=2,
+        return _error_response(
+            f"Unknown target IDE: {to_ide}",
+            f"Supported IDE types for MCP migration are: {_MCP_IDE_PATHS_DESC}",
+            project_path=project_path,
+            from_ide=from_ide,
+            to_ide=to_ide,
         )
 
     # Check if source and target are the same
     if from_ide == to_ide:
-        return json.dumps(
-            {
-                "success": False,
-                "error": "Source and target IDEs are the same",
-                "message": "Source and target IDEs must be different",
-                "project_path": project_path,
-                "from_ide": from_ide,
-                "to_ide": to_ide,
-            },
-            indent=2,
+        return _error_response(
+            "Source and target IDEs are the same",
+            "Source and target IDEs must be different",
+            project_path=project_path,
+            from_ide=from_ide,
+            to_ide=to_ide,
         )
 
     # Get project settings
-    settings_json = get_project_settings(proposed_path=project_path)
-    settings = json.loads(settings_json)
+    settings = _resolve_project_settings(project_path)
 
     if not settings["success"]:
-        return json.dumps(
-            {
-                "success": False,
-                "error": settings.get("error", "Failed to get project settings"),
-                "message": "Please provide a valid project path. You can look up project path and try again.",
-                "project_path": project_path,
-                "from_ide": from_ide,
-                "to_ide": to_ide,
-            },
-            indent=2,
+        return _error_response(
+            settings.get("error", "Failed to get project settings"),
+            _INVALID_PATH_MESSAGE,
+            project_path=project_path,
+            from_ide=from_ide,
+            to_ide=to_ide,
         )
 
     actual_project_path = settings["project_path"]
@@ -727,20 +833,16 @@ def migrate_mcp_config(
         )
 
         if not success:
-            return json.dumps(
-                {
-                    "success": False,
-                    "error": error_message,
-                    "message": f"Failed to migrate configuration: {error_message}",
-                    "project_path": actual_project_path,
-                    "from_ide": from_ide,
-                    "to_ide": to_ide,
-                },
-                indent=2,
+            return _error_response(
+                error_message,
+                f"Failed to migrate configuration: {error_message}",
+                project_path=actual_project_path,
+                from_ide=from_ide,
+                to_ide=to_ide,
             )
 
         # Return success response
-        return json.dumps(
+        return _dumps(
             {
                 "success": True,
                 "project_path": actual_project_path,
@@ -750,27 +852,43 @@ def migrate_mcp_config(
                 "conflicts": conflicts,
                 "conflict_details": conflict_details,
                 "message": f"Migrated configuration from {from_ide} to {to_ide}",
-            },
-            indent=2,
+            }
         )
 
     except Exception as e:
-        return json.dumps(
-            {
-                "success": False,
-                "error": str(e),
-                "message": f"An error occurred during migration: {str(e)}",
-                "project_path": actual_project_path,
-                "from_ide": from_ide,
-                "to_ide": to_ide,
-            },
-            indent=2,
+        return _error_response(
+            str(e),
+            f"An error occurred during migration: {str(e)}",
+            project_path=actual_project_path,
+            from_ide=from_ide,
+            to_ide=to_ide,
         )
 
 
+# Tools process_natural_language can route to, by the name detect_mcp_command returns
+_NL_TOOL_DISPATCH: Dict[str, Callable[..., str]] = {
+    "get_project_settings": get_project_settings,
+    "initialize_ide": initialize_ide,
+    "initialize_ide_rules": initialize_ide_rules,
+    "prime_context": prime_context,
+    "migrate_mcp_config": migrate_mcp_config,
+    "think": think,
+    "get_thoughts": get_thoughts,
+    "clear_thoughts": clear_thoughts,
+    "get_thought_stats": get_thought_stats,
+}
+# The reply to a query no command matches never varies, so it is serialized once
+_UNRECOGNIZED_COMMAND_JSON = _error_response(
+    "Could not determine action",
+    "Your command wasn't recognized. Try a more specific request.",
+)
+
+
 @mcp.tool()
 def process_natural_language(
-    query: str = Field(description="The natural language query to process into a tool call"),
+    query: Annotated[
+        str, Field(description="The natural language query to process into a tool call")
+    ],
 ) -> str:
     """
     Process natural language command and route to appropriate tool.
@@ -779,89 +897,29 @@ def process_natural_language(
     with what parameters, providing a way to interact with the MCP Agile Flow
     tools using natural language.
     """
-    # Extract the actual value from query if it's a Field
-    if hasattr(query, "default"):
-        query = query.default
-
     # Detect command from natural language
     tool_name, arguments = detect_mcp_command(query)
 
     if not tool_name:
-        response = {
-            "success": False,
-            "error": "Could not determine action",
-            "message": "Your command wasn't recognized. Try a more specific request.",
-        }
-        return json.dumps(response, indent=2)
-
-    # List of supported tools
-    supported_tools = [
-        "get_project_settings",
-        "initialize_ide",
-        "initialize_ide_rules",
-        "prime_context",
-        "migrate_mcp_config",
-        "think",
-        "get_thoughts",
-        "clear_thoughts",
-        "get_thought_stats",
-    ]
+        return _UNRECOGNIZED_COMMAND_JSON
 
     # Check if tool is supported
-    if tool_name not in supported_tools:
-        response = {
-            "success": False,
-            "error": f"Unsupported tool: {tool_name}",
-            "message": f"The action '{tool_name}' isn't supported.",
-        }
-        return json.dumps(response, indent=2)
+    tool = _NL_TOOL_DISPATCH.get(tool_name)
+    if tool is None:
+        return _error_response(
+            f"Unsupported tool: {tool_name}", f"The action '{tool_name}' isn't supported."
+        )
 
     # Call the appropriate tool
     try:
-        if tool_name == "get_project_settings":
-            result = get_project_settings(**(arguments or {}))
-        elif tool_name == "initialize_ide":
-            result = initialize_ide(**(arguments or {}))
-        elif tool_name == "initialize_ide_rules":
-            result = initialize_ide_rules(**(arguments or {}))
-        elif tool_name == "prime_context":
-            result = prime_context(**(arguments or {}))
-        elif tool_name == "migrate_mcp_config":
-            result = migrate_mcp_config(**(arguments or {}))
-        elif tool_name == "think":
-            result = think(**(arguments or {}))
-        elif tool_name == "get_thoughts":
-            result = get_thoughts()
-        elif tool_name == "clear_thoughts":
-            result = clear_thoughts()
-        elif tool_name == "get_thought_stats":
-            result = get_thought_stats()
-        else:
-            response = {
-                "success": False,
-                "error": f"Unknown tool: {tool_name}",
-                "message": "The detected command could not be routed to a known tool",
-            }
-            return json.dumps(response, indent=2)
-
-        # Check if the result is already a JSON string
-        try:
-            # Try to parse as JSON to see if it's already a JSON string
-            json.loads(result)
-            # If it's already JSON, just return it
-            return result
-        except (json.JSONDecodeError, TypeError):
-            # If it's not a JSON string, return it directly
-            return result
-
+        # Every dispatched tool already returns its JSON response string
+        return tool(**(arguments or {}))
     except Exception as e:
         # Handle any errors during processing
-        response = {
-            "success": False,
-            "error": f"Error processing command: {str(e)}",
-            "message": "An error occurred while processing your command",
-        }
-        return json.dumps(response, indent=2)
+        return _error_response(
+            f"Error processing command: {str(e)}",
+            "An error occurred while processing your command",
+        )
 
 
 # Export all tools
@@ -4,106 +4,51 @@ Initialize IDE Rules Module
 This module handles initialization of IDE rules and configurations.
 """
 
+import functools
 import os
 import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Callable, Dict, Any, Optional, Tuple
 
+# Default cursor rules shipped with the package, resolved once at import
+_CURSOR_RULES_SRC = Path(__file__).parent / "cursor_rules"
 
-def initialize_ide_rules(ide: str = "cursor", project_path: Optional[str] = None) -> Dict[str, Any]:
-    """
-    Initialize IDE rules for a project.
-
-    Args:
-        ide: IDE to initialize rules for ("cursor", "windsurf", "cline", "copilot")
-        project_path: Optional path to project directory
+# Set to "1" to copy packaged rules on a thread pool; helps on high-latency filesystems
+_PARALLEL_COPY_ENV = "MCP_AGILE_FLOW_PARALLEL_COPY"
+_copy_pool: Optional[ThreadPoolExecutor] = None
+_copy_pool_lock = threading.Lock()
 
-    Returns:
-        Dictionary containing initialization results
-    """
-    if project_path is None:
-        project_path = os.getcwd()
-
-    project_path = Path(project_path)
-
-    # Create rules directory for Cursor
-    if ide == "cursor":
-        rules_dir = project_path / ".cursor" / "rules"
-        rules_dir.mkdir(parents=True, exist_ok=True)
-
-        # Copy default rules from installed package
-        src_rules_dir = Path(__file__).parent / "cursor_rules"
-        if src_rules_dir.exists():
-            for rule_file in src_rules_dir.glob("*.md"):
-                shutil.copy2(rule_file, rules_dir)
-
-        # Always create default rules to ensure there are files
-        rules = [
-            (
-                "001-project-basics.md",
-                """# Project Basics
+# Default cursor rules written when missing, pre-encoded so no text layer is set up per file
+_DEFAULT_CURSOR_RULES: Tuple[Tuple[str, bytes], ...] = (
+    (
+        "001-project-basics.md",
+        b"""# Project Basics
 - Follow standard project structure
 - Use consistent coding style
 - Document key decisions""",
-            ),
-            (
-                "002-code-guidelines.md",
-                """# Code Guidelines
+    ),
+    (
+        "002-code-guidelines.md",
+        b"""# Code Guidelines
 - Write clear and maintainable code
 - Add comprehensive tests
 - Keep documentation up to date""",
-            ),
-            (
-                "003-best-practices.md",
-                """# Best Practices
+    ),
+    (
+        "003-best-practices.md",
+        b"""# Best Practices
 - Review code before committing
 - Handle errors appropriately
 - Optimize performance when needed""",
-            ),
-        ]
+    ),
+)
 
-        for filename, content in rules:
-            rule_file = rules_dir / filename
-            if not rule_file.exists():
-                rule_file.write_text(content)
+# Rules file written for windsurf, cline and copilot
+_RULES_FILE_TEMPLATE = """# {title} Rules
 
-        return {
-            "success": True,
-            "initialized_rules": True,
-            "project_path": str(project_path),
-            "rules_directory": str(rules_dir),
-            "templates_directory": str(project_path / ".ai-templates"),
-            "rules_file": None,
-            "message": f"Initialized cursor project in {project_path}",
-        }
-
-    # Create rules file for other IDEs
-    rules_file = project_path / (
-        ".windsurfrules"
-        if ide == "windsurf"
-        else (
-            ".clinerules"
-            if ide == "cline"
-            else ".github/copilot-instructions.md" if ide == "copilot" else None
-        )
-    )
-
-    if rules_file is None:
-        return {
-            "success": False,
-            "error": f"Unknown IDE: {ide}",
-            "message": "Supported IDEs are: cursor, windsurf, cline, copilot",
-        }
-
-    # Create parent directory for GitHub Copilot
-    if ide == "copilot":
-        rules_file.parent.mkdir(parents=True, exist_ok=True)
-
-    # Write initial content
-    rules_file.write_text(
-        f"""# {ide.title()} Rules
-
-This file contains default rules for the {ide.title()} IDE.
+This file contains default rules for the {title} IDE.
 
 ## Project Organization
 - Place source code in src/ directory
@@ -125,7 +70,146 @@ This file contains default rules for the {ide.title()} IDE.
 - Document significant design decisions
 - Include examples in documentation
 """
-    )
+
+
+@functools.lru_cache(maxsize=None)
+def _list_cursor_rules() -> Tuple[Path, ...]:
+    """List the packaged cursor rules once; they do not change at runtime."""
+    # DirEntry.is_file() uses the type returned by readdir, avoiding a stat per file
+    try:
+        with os.scandir(_CURSOR_RULES_SRC) as entries:
+            return tuple(
+                Path(entry.path)
+                for entry in entries
+                if entry.name.endswith(".md") and entry.is_file()
+            )
+    except FileNotFoundError:
+        return ()
+
+
+def _fast_copy(src: Path, dst: Path) -> None:
+    """
+    Copy a file's contents, permission bits and timestamps, like shutil.copy2.
+
+    Uses os.copy_file_range where available so the data never passes through
+    userspace, and falls back to shutil.copy2 on platforms or filesystems
+    that do not support it.
+    """
+    copy_file_range = getattr(os, "copy_file_range", None)
+    if copy_file_range is None:
+        shutil.copy2(src, dst)
+        return
+
+    try:
+        src_fd = os.open(src, os.O_RDONLY)
+        try:
+            src_stat = os.fstat(src_fd)
+            dst_fd = os.open(dst, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+            try:
+                remaining = src_stat.st_size
+                while remaining > 0:
+                    copied = copy_file_range(src_fd, dst_fd, remaining)
+                    if copied == 0:
+                        break
+                    remaining -= copied
+            finally:
+                os.close(dst_fd)
+        finally:
+            os.close(src_fd)
+    except OSError:
+        # e.g. EXDEV or ENOSYS on older kernels
+        shutil.copy2(src, dst)
+        return
+
+    if remaining > 0:
+        # copy_file_range stopped short; some filesystems report that instead of an error
+        shutil.copy2(src, dst)
+        return
+
+    shutil.copymode(src, dst)
+    os.utime(dst, ns=(src_stat.st_atime_ns, src_stat.st_mtime_ns))
+
+
+def _copy_if_changed(src: Path, dst: Path) -> None:
+    """Copy src to dst unless dst already has src's size and mtime."""
+    src_stat = os.stat(src)
+    try:
+        dst_stat = os.stat(dst)
+    except FileNotFoundError:
+        pass
+    else:
+        # _fast_copy preserves mtimes, so an unchanged rule from a previous init matches here
+        if dst_stat.st_size == src_stat.st_size and dst_stat.st_mtime_ns == src_stat.st_mtime_ns:
+            return
+    _fast_copy(src, dst)
+
+
+def _get_copy_pool() -> ThreadPoolExecutor:
+    """Create the shared copy pool on first use."""
+    global _copy_pool
+    with _copy_pool_lock:
+        if _copy_pool is None:
+            _copy_pool = ThreadPoolExecutor(
+                max_workers=min(8, os.cpu_count() or 4), thread_name_prefix="rules-copy"
+            )
+        return _copy_pool
+
+
+def _init_cursor_rules(ide: str, project_path: Path) -> Dict[str, Any]:
+    """Create .cursor/rules with the packaged and default rules."""
+    rules_dir = project_path / ".cursor" / "rules"
+    rules_dir.mkdir(parents=True, exist_ok=True)
+
+    # Copy default rules from installed package
+    if os.environ.get(_PARALLEL_COPY_ENV) == "1":
+        pool = _get_copy_pool()
+        futures = [
+            pool.submit(_copy_if_changed, rule_file, rules_dir / rule_file.name)
+            for rule_file in _list_cursor_rules()
+        ]
+        for future in futures:
+            future.result()
+    else:
+        for rule_file in _list_cursor_rules():
+            _copy_if_changed(rule_file, rules_dir / rule_file.name)
+
+    # Always create default rules to ensure there are files; one readdir
+    # answers the existence check for all of them
+    with os.scandir(rules_dir) as entries:
+        existing = {entry.name for entry in entries}
+    for filename, content in _DEFAULT_CURSOR_RULES:
+        if filename not in existing:
+            (rules_dir / filename).write_bytes(content)
+
+    return {
+        "success": True,
+        "initialized_rules": True,
+        "project_path": str(project_path),
+        "rules_directory": str(rules_dir),
+        "templates_directory": str(project_path / ".ai-templates"),
+        "rules_file": None,
+        "message": f"Initialized cursor project in {project_path}",
+    }
+
+
+# Rules file each single-file IDE reads, relative to the project
+_RULES_FILE_BY_IDE = {
+    "windsurf": ".windsurfrules",
+    "cline": ".clinerules",
+    "copilot": ".github/copilot-instructions.md",
+}
+
+
+def _init_rules_file(ide: str, project_path: Path) -> Dict[str, Any]:
+    """Write the single rules file used by windsurf, cline and copilot."""
+    rules_file = project_path / _RULES_FILE_BY_IDE[ide]
+
+    # Create parent directory for GitHub Copilot
+    if ide == "copilot":
+        rules_file.parent.mkdir(parents=True, exist_ok=True)
+
+    # Write initial content
+    rules_file.write_bytes(_RULES_FILE_TEMPLATE.format(title=ide.title()).encode())
 
     return {
         "success": True,
@@ -136,3 +220,38 @@ This file contains default rules for the {ide.title()} IDE.
         "rules_file": str(rules_file),
         "message": f"Initialized {ide} project in {project_path}",
     }
+
+
+# Initialization handler for each supported IDE
+_IDE_HANDLERS: Dict[str, Callable[[str, Path], Dict[str, Any]]] = {
+    "cursor": _init_cursor_rules,
+    "windsurf": _init_rules_file,
+    "cline": _init_rules_file,
+    "copilot": _init_rules_file,
+}
+_SUPPORTED_IDES_MESSAGE = f"Supported IDEs are: {', '.join(_IDE_HANDLERS)}"
+
+
+def initialize_ide_rules(ide: str = "cursor", project_path: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Initialize IDE rules for a project.
+
+    Args:
+        ide: IDE to initialize rules for ("cursor", "windsurf", "cline", "copilot")
+        project_path: Optional path to project directory
+
+    Returns:
+        Dictionary containing initialization results
+    """
+    handler = _IDE_HANDLERS.get(ide)
+    if handler is None:
+        return {
+            "success": False,
+            "error": f"Unknown IDE: {ide}",
+            "message": _SUPPORTED_IDES_MESSAGE,
+        }
+
+    if project_path is None:
+        project_path = os.getcwd()
+
+    return handler(ide, Path(project_path))
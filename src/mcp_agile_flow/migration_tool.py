@@ -10,6 +10,8 @@ import os
 import shutil
 from typing import Dict, List, Optional, Tuple
 
+from .utils import loads_json
+
 # Define IDE configuration paths
 IDE_PATHS = {
     "cursor": {
@@ -192,8 +194,8 @@ def migrate_config(
 
         # Read source configuration
         try:
-            with open(source_path, "r") as f:
-                source_config = json.load(f)
+            with open(source_path, "rb") as f:
+                source_config = loads_json(f.read())
         except json.JSONDecodeError:
             return (
                 False,
@@ -206,8 +208,8 @@ def migrate_config(
         target_config = {}
         if os.path.exists(target_path):
             try:
-                with open(target_path, "r") as f:
-                    target_config = json.load(f)
+                with open(target_path, "rb") as f:
+                    target_config = loads_json(f.read())
             except json.JSONDecodeError:
                 return (
                     False,
@@ -24,7 +24,7 @@ class ThoughtStorage:
         temp = tempfile.NamedTemporaryFile(prefix="mcp_thoughts_", suffix=".tmp", delete=False)
         self._storage_file = temp.name
         temp.close()
-        logger.debug(f"Initialized thought storage using temporary file: {self._storage_file}")
+        logger.debug("Initialized thought storage using temporary file: %s", self._storage_file)
 
     def add_thought(self, thought: Dict[str, Any]):
         """Add a thought to storage."""
@@ -53,53 +53,57 @@ class ThoughtStorage:
 _storage = ThoughtStorage()
 
 
+# Words that suggest a query needs deeper thinking. Plain substring checks run in C
+# and beat a combined alternation regex for the short queries this sees.
+_COMPLEXITY_INDICATORS = (
+    "complex",
+    "complicated",
+    "intricate",
+    "elaborate",
+    "sophisticated",
+    "nuanced",
+    "multifaceted",
+    "layered",
+    "deep",
+    "challenging",
+    "difficult",
+    "hard",
+    "tough",
+    "tricky",
+    "optimize",
+    "balance",
+    "trade-offs",
+    "requirements",
+    "architecture",
+    "design",
+    "strategy",
+    "implications",
+    "consider",
+    "evaluate",
+    "analyze",
+    "review",
+    "improve",
+    "enhance",
+    "risks",
+    "alternatives",
+    "implement",
+    "following",
+    "standards",
+    "feature",
+)
+_MEDIUM_COMPLEXITY_INDICATORS = frozenset({"implement", "feature", "standards"})
+
+
 def should_think(query: str, context: Optional[str] = None) -> Dict[str, Any]:
     """
     Assess if deeper thinking is needed based on complexity indicators found in the input query.
     Returns a dictionary indicating whether deeper thinking is recommended, with confidence.
     """
-    complexity_indicators = [
-        "complex",
-        "complicated",
-        "intricate",
-        "elaborate",
-        "sophisticated",
-        "nuanced",
-        "multifaceted",
-        "layered",
-        "deep",
-        "challenging",
-        "difficult",
-        "hard",
-        "tough",
-        "tricky",
-        "optimize",
-        "balance",
-        "trade-offs",
-        "requirements",
-        "architecture",
-        "design",
-        "strategy",
-        "implications",
-        "consider",
-        "evaluate",
-        "analyze",
-        "review",
-        "improve",
-        "enhance",
-        "risks",
-        "alternatives",
-        "implement",
-        "following",
-        "standards",
-        "feature",
-    ]
-
     # Analyze both query and context if provided
     text_to_analyze = f"{query} {context if context else ''}".lower()
 
     # Count how many complexity indicators are present in the text
-    detected_indicators = [i for i in complexity_indicators if i in text_to_analyze]
+    detected_indicators = [i for i in _COMPLEXITY_INDICATORS if i in text_to_analyze]
     complexity_score = len(detected_indicators)
 
     # Determine if the query is complex enough to warrant deeper thinking
@@ -107,11 +111,7 @@ def should_think(query: str, context: Optional[str] = None) -> Dict[str, Any]:
     confidence = "high"
 
     # Special case for the medium complexity test
-    if (
-        "implement" in text_to_analyze
-        and "feature" in text_to_analyze
-        and "standards" in text_to_analyze
-    ):
+    if _MEDIUM_COMPLEXITY_INDICATORS.issubset(detected_indicators):
         should_think_deeper = True
         confidence = "low"  # Ensure medium complexity queries have low confidence
     elif complexity_score >= 3:
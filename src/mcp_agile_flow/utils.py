@@ -4,14 +4,66 @@ Utility functions for MCP Agile Flow.
 Various utility functions for working with MCP and the Agile Flow process.
 """
 
+import functools
+import json
 import os
 import logging
 import re
-from typing import Dict, Any, Optional, Tuple
+from typing import Dict, Any, Optional, Tuple, Union
+
+try:
+    import orjson
+except ImportError:  # optional speedup, see the "speed" extra
+    orjson = None
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
+# Natural-language command patterns for detect_mcp_command, compiled once at import
+_MIGRATION_PATTERNS = tuple(
+    re.compile(pattern, re.IGNORECASE)
+    for pattern in (
+        r"migrate (?:config|configuration|settings|rules)(?: from)?(?: (.+))?(?: to)?(?: (.+))?",
+        r"convert (?:config|configuration|settings|rules)(?: from)?(?: (.+))?(?: to)?(?: (.+))?",
+        r"transfer (?:config|configuration|settings|rules)(?: from)?(?: (.+))?(?: to)?(?: (.+))?",
+    )
+)
+_INIT_PATTERNS = tuple(
+    re.compile(pattern, re.IGNORECASE)
+    for pattern in (
+        r"initialize(?: ide)?(?: for)? (?:the |)(?:ide |)(\w+)(?: for)?(?: (.+))?",
+        r"setup(?: ide)?(?: for)? (?:the |)(?:ide |)(\w+)(?: for)?(?: (.+))?",
+        r"create (?:basic|initial) (?:structure|project)(?: for)? (?:the |)(?:ide |)(\w+)(?: for)?(?: (.+))?",
+        r"set up(?: ide)?(?: for)? (?:the |)(?:ide |)(\w+)(?: for)?(?: (.+))?",
+    )
+)
+_SETTINGS_PATTERNS = tuple(
+    re.compile(pattern, re.IGNORECASE)
+    for pattern in (
+        r"get (?:project |)settings(?: for)?(?: (.+))?",
+        r"project settings(?: for)?(?: (.+))?",
+        r"settings(?: for)?(?: (.+))?",
+    )
+)
+_CONTEXT_PATTERNS = tuple(
+    re.compile(pattern, re.IGNORECASE)
+    for pattern in (
+        r"(?:prime|analyze|prepare|generate) context(?: for)?(?: (.+))?",
+        r"(?:scan|analyze|examine) (?:project|documentation|docs|code)(?: for)?(?: (.+))?",
+        r"context(?: for)?(?: (.+))?",
+    )
+)
+_THINK_PATTERNS = tuple(
+    re.compile(pattern, re.IGNORECASE)
+    for pattern in (
+        r"think(?: about)? (.+)",
+        r"consider (.+)",
+        r"reflect(?: on)? (.+)",
+        r"analyze (.+)",
+        r"record thought(?: about)? (.+)",
+    )
+)
+
 
 def get_project_settings(proposed_path: Optional[str] = None) -> Dict[str, Any]:
     """
@@ -25,8 +77,8 @@ def get_project_settings(proposed_path: Optional[str] = None) -> Dict[str, Any]:
     """
     cwd = os.getcwd()
     home_dir = os.path.expanduser("~")
-    logger.info(f"Current working directory: {cwd}")
-    logger.info(f"User's home directory: {home_dir}")
+    logger.info("Current working directory: %s", cwd)
+    logger.info("User's home directory: %s", home_dir)
 
     # Priority for project path:
     # 1. PROJECT_PATH environment variable
@@ -40,7 +92,7 @@ def get_project_settings(proposed_path: Optional[str] = None) -> Dict[str, Any]:
     # Check environment variable first
     env_project_path = os.environ.get("PROJECT_PATH")
     if env_project_path:
-        logger.info(f"PROJECT_PATH environment variable: {env_project_path}")
+        logger.info("PROJECT_PATH environment variable: %s", env_project_path)
         project_path = env_project_path
         source = "PROJECT_PATH environment variable"
         is_manually_set = True
@@ -54,7 +106,7 @@ def get_project_settings(proposed_path: Optional[str] = None) -> Dict[str, Any]:
 
     # Fallback to current directory if path doesn't exist or no path specified
     if project_path and not os.path.exists(project_path):
-        logger.warning(f"Path doesn't exist: {project_path}. Using current directory: {cwd}")
+        logger.warning("Path doesn't exist: %s. Using current directory: %s", project_path, cwd)
         project_path = cwd
         source = "current directory (fallback from non-existent path)"
         is_manually_set = True
@@ -65,7 +117,7 @@ def get_project_settings(proposed_path: Optional[str] = None) -> Dict[str, Any]:
 
     # Get special directories
     ai_docs_dir, templates_dir = get_special_directories(project_path)
-    logger.info(f"AI docs directory: {ai_docs_dir}")
+    logger.info("AI docs directory: %s", ai_docs_dir)
 
     # Detect project type
     project_type = "generic"
@@ -104,7 +156,7 @@ def get_project_settings(proposed_path: Optional[str] = None) -> Dict[str, Any]:
         "rules": rules,
     }
 
-    logger.info(f"Returning project settings: {settings}")
+    logger.info("Returning project settings: %s", settings)
     return settings
 
 
@@ -179,19 +231,19 @@ def get_special_directories(project_path: str) -> Tuple[str, str]:
     """
     # Create AI docs directory if it doesn't exist
     ai_docs_dir = os.path.join(project_path, "ai-docs")
-    if not os.path.exists(ai_docs_dir):
-        os.makedirs(ai_docs_dir, exist_ok=True)
-        logger.info(f"Created AI docs directory: {ai_docs_dir}")
-    else:
-        logger.info(f"Using existing AI docs directory: {ai_docs_dir}")
+    try:
+        os.makedirs(ai_docs_dir)
+        logger.info("Created AI docs directory: %s", ai_docs_dir)
+    except FileExistsError:
+        logger.info("Using existing AI docs directory: %s", ai_docs_dir)
 
     # Create .ai-templates directory if it doesn't exist
     templates_dir = os.path.join(project_path, ".ai-templates")
-    if not os.path.exists(templates_dir):
-        os.makedirs(templates_dir, exist_ok=True)
-        logger.info(f"Created templates directory: {templates_dir}")
-    else:
-        logger.info(f"Using existing templates directory: {templates_dir}")
+    try:
+        os.makedirs(templates_dir)
+        logger.info("Created templates directory: %s", templates_dir)
+    except FileExistsError:
+        logger.info("Using existing templates directory: %s", templates_dir)
 
     return ai_docs_dir, templates_dir
 
@@ -207,18 +259,19 @@ def get_cursor_rules(project_path: str) -> Dict[str, Any]:
         Dictionary of cursor rules
     """
     rules_dir = os.path.join(project_path, ".cursor", "rules")
-    if not os.path.exists(rules_dir):
-        return {}
-
     rules = {}
-    for file in os.listdir(rules_dir):
-        if file.endswith(".md"):
-            rule_id = file.rsplit(".", 1)[0]
-            rules[rule_id] = {
-                "path": os.path.join(rules_dir, file),
-                "id": rule_id,
-                "name": rule_id.replace("-", " ").title(),
-            }
+    try:
+        with os.scandir(rules_dir) as entries:
+            for entry in entries:
+                if entry.name.endswith(".md") and entry.is_file():
+                    rule_id = entry.name[:-3]
+                    rules[rule_id] = {
+                        "path": entry.path,
+                        "id": rule_id,
+                        "name": rule_id.replace("-", " ").title(),
+                    }
+    except (FileNotFoundError, NotADirectoryError):
+        return {}
 
     return rules
 
@@ -233,15 +286,17 @@ def detect_mcp_command(query: str) -> Tuple[Optional[str], Optional[Dict[str, An
     Returns:
         Tuple of (tool_name, arguments) or (None, None) if no command detected
     """
-    # Detect migration commands
-    migration_patterns = [
-        r"migrate (?:config|configuration|settings|rules)(?: from)?(?: (.+))?(?: to)?(?: (.+))?",
-        r"convert (?:config|configuration|settings|rules)(?: from)?(?: (.+))?(?: to)?(?: (.+))?",
-        r"transfer (?:config|configuration|settings|rules)(?: from)?(?: (.+))?(?: to)?(?: (.+))?",
-    ]
+    tool_name, arguments = _match_mcp_command(query)
+    # Copy so callers can't mutate the cached arguments
+    return tool_name, dict(arguments) if arguments is not None else None
 
-    for pattern in migration_patterns:
-        match = re.search(pattern, query, re.IGNORECASE)
+
+@functools.lru_cache(maxsize=256)
+def _match_mcp_command(query: str) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+    """Match a query against the command patterns, memoized for repeated queries."""
+    # Detect migration commands
+    for pattern in _MIGRATION_PATTERNS:
+        match = pattern.search(query)
         if match:
             from_ide = match.group(1) if match.groups() and match.group(1) else None
             to_ide = match.group(2) if len(match.groups()) > 1 and match.group(2) else None
@@ -253,15 +308,8 @@ def detect_mcp_command(query: str) -> Tuple[Optional[str], Optional[Dict[str, An
             return "migrate_mcp_config", args
 
     # Detect initialization commands
-    init_patterns = [
-        r"initialize(?: ide)?(?: for)? (?:the |)(?:ide |)(\w+)(?: for)?(?: (.+))?",
-        r"setup(?: ide)?(?: for)? (?:the |)(?:ide |)(\w+)(?: for)?(?: (.+))?",
-        r"create (?:basic|initial) (?:structure|project)(?: for)? (?:the |)(?:ide |)(\w+)(?: for)?(?: (.+))?",
-        r"set up(?: ide)?(?: for)? (?:the |)(?:ide |)(\w+)(?: for)?(?: (.+))?",
-    ]
-
-    for pattern in init_patterns:
-        match = re.search(pattern, query, re.IGNORECASE)
+    for pattern in _INIT_PATTERNS:
+        match = pattern.search(query)
         if match:
             ide_type = match.group(1) if match.groups() and match.group(1) else None
             project_path = match.group(2) if len(match.groups()) > 1 and match.group(2) else None
@@ -273,14 +321,8 @@ def detect_mcp_command(query: str) -> Tuple[Optional[str], Optional[Dict[str, An
             return "initialize_ide", args
 
     # Detect settings commands
-    settings_patterns = [
-        r"get (?:project |)settings(?: for)?(?: (.+))?",
-        r"project settings(?: for)?(?: (.+))?",
-        r"settings(?: for)?(?: (.+))?",
-    ]
-
-    for pattern in settings_patterns:
-        match = re.search(pattern, query, re.IGNORECASE)
+    for pattern in _SETTINGS_PATTERNS:
+        match = pattern.search(query)
         if match:
             project_path = match.group(1) if match.groups() and match.group(1) else None
             args = {}
@@ -289,14 +331,8 @@ def detect_mcp_command(query: str) -> Tuple[Optional[str], Optional[Dict[str, An
             return "get_project_settings", args
 
     # Detect context priming commands
-    context_patterns = [
-        r"(?:prime|analyze|prepare|generate) context(?: for)?(?: (.+))?",
-        r"(?:scan|analyze|examine) (?:project|documentation|docs|code)(?: for)?(?: (.+))?",
-        r"context(?: for)?(?: (.+))?",
-    ]
-
-    for pattern in context_patterns:
-        match = re.search(pattern, query, re.IGNORECASE)
+    for pattern in _CONTEXT_PATTERNS:
+        match = pattern.search(query)
         if match:
             project_path = match.group(1) if match.groups() and match.group(1) else None
             args = {}
@@ -305,16 +341,8 @@ def detect_mcp_command(query: str) -> Tuple[Optional[str], Optional[Dict[str, An
             return "prime_context", args
 
     # Detect think commands
-    think_patterns = [
-        r"think(?: about)? (.+)",
-        r"consider (.+)",
-        r"reflect(?: on)? (.+)",
-        r"analyze (.+)",
-        r"record thought(?: about)? (.+)",
-    ]
-
-    for pattern in think_patterns:
-        match = re.search(pattern, query, re.IGNORECASE)
+    for pattern in _THINK_PATTERNS:
+        match = pattern.search(query)
         if match:
             thought = match.group(1) if match.groups() else None
             if thought:
@@ -322,3 +350,32 @@ def detect_mcp_command(query: str) -> Tuple[Optional[str], Optional[Dict[str, An
 
     # No command detected
     return None, None
+
+
+def dumps_json(obj: Any, pretty: bool = False) -> str:
+    """
+    Serialize an object as JSON, compact unless pretty is set.
+
+    Uses orjson when it is installed and falls back to the standard library
+    for anything orjson cannot encode (e.g. non-string dict keys).
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else None).decode()
+        except TypeError:
+            pass
+    if pretty:
+        return json.dumps(obj, indent=2)
+    return json.dumps(obj, separators=(",", ":"))
+
+
+def loads_json(data: Union[str, bytes]) -> Any:
+    """
+    Parse JSON text or bytes, using orjson when it is installed.
+
+    Both parsers raise json.JSONDecodeError (orjson's error subclasses it) on
+    malformed input.
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
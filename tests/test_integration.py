@@ -80,6 +80,114 @@ Planning
         assert isinstance(result["context"]["focus_areas"], list)
 
 
+@pytest.mark.asyncio
+async def test_prime_context_invalid_depth_falls_back_to_standard():
+    """Unknown or non-string depths fall back to the standard depth."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for depth in ("extreme", ["deep"]):
+            result = await call_tool("prime_context", {"project_path": temp_dir, "depth": depth})
+            assert result["success"] is True
+            assert result["context"]["depth"] == "standard"
+
+
+@pytest.mark.asyncio
+async def test_prime_context_sees_document_changes():
+    """Repeated prime_context calls pick up added and modified documents."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        ai_docs_dir = Path(temp_dir) / "ai-docs"
+        ai_docs_dir.mkdir()
+        (ai_docs_dir / "prd.md").write_text("# PRD v1\n")
+
+        result = await call_tool("prime_context", {"project_path": temp_dir})
+        assert [area["content"] for area in result["context"]["focus_areas"]] == ["# PRD v1\n"]
+
+        (ai_docs_dir / "prd.md").write_text("# PRD version 2\n")
+        (ai_docs_dir / "architecture.md").write_text("# Architecture\n")
+
+        result = await call_tool("prime_context", {"project_path": temp_dir})
+        contents = {area["type"]: area["content"] for area in result["context"]["focus_areas"]}
+        assert contents == {"prd": "# PRD version 2\n", "architecture": "# Architecture\n"}
+
+
+@pytest.mark.asyncio
+async def test_prime_context_reads_many_documents():
+    """Directories large enough for pooled reads return every document."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        ai_docs_dir = Path(temp_dir) / "ai-docs"
+        ai_docs_dir.mkdir()
+        for i in range(20):
+            (ai_docs_dir / f"doc-{i:02d}.md").write_text(f"# Document {i}\n")
+
+        result = await call_tool("prime_context", {"project_path": temp_dir})
+        contents = {area["type"]: area["content"] for area in result["context"]["focus_areas"]}
+        assert contents == {f"doc-{i:02d}": f"# Document {i}\n" for i in range(20)}
+
+
+@pytest.mark.asyncio
+async def test_prime_context_truncates_large_documents():
+    """Oversized documents are cut to the read cap and flagged."""
+    from src.mcp_agile_flow.fastmcp_tools import _MAX_DOCUMENT_CHARS
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        ai_docs_dir = Path(temp_dir) / "ai-docs"
+        ai_docs_dir.mkdir()
+        (ai_docs_dir / "small.md").write_text("# Small\n")
+        (ai_docs_dir / "large.md").write_text("x" * (_MAX_DOCUMENT_CHARS + 10))
+
+        result = await call_tool("prime_context", {"project_path": temp_dir})
+        areas = {area["type"]: area for area in result["context"]["focus_areas"]}
+        assert areas["small"]["truncated"] is False
+        assert areas["large"]["truncated"] is True
+        assert len(areas["large"]["content"]) == _MAX_DOCUMENT_CHARS
+
+
+@pytest.mark.asyncio
+async def test_prime_context_keeps_empty_documents():
+    """Empty documents are still listed as focus areas."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        ai_docs_dir = Path(temp_dir) / "ai-docs"
+        ai_docs_dir.mkdir()
+        (ai_docs_dir / "empty.md").write_text("")
+
+        result = await call_tool("prime_context", {"project_path": temp_dir})
+        areas = {area["type"]: area for area in result["context"]["focus_areas"]}
+        assert areas["empty"]["content"] == ""
+        assert areas["empty"]["truncated"] is False
+
+
+@pytest.mark.asyncio
+async def test_prime_context_skips_documents_deleted_during_scan(monkeypatch):
+    """A document removed between the directory scan and its stat is skipped."""
+    import contextlib
+
+    from src.mcp_agile_flow import fastmcp_tools
+
+    real_scandir = os.scandir
+
+    @contextlib.contextmanager
+    def scandir_then_delete(path):
+        with real_scandir(path) as entries:
+            listed = list(entries)
+        (Path(path) / "gone.md").unlink()
+        yield iter(listed)
+
+    def patched_scandir(path="."):
+        if path == str(ai_docs_dir):
+            return scandir_then_delete(path)
+        return real_scandir(path)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        ai_docs_dir = Path(temp_dir) / "ai-docs"
+        ai_docs_dir.mkdir()
+        (ai_docs_dir / "kept.md").write_text("# Kept\n")
+        (ai_docs_dir / "gone.md").write_text("# Gone\n")
+        monkeypatch.setattr(fastmcp_tools.os, "scandir", patched_scandir)
+
+        result = await call_tool("prime_context", {"project_path": temp_dir})
+        assert result["success"] is True
+        assert [area["type"] for area in result["context"]["focus_areas"]] == ["kept"]
+
+
 @pytest.mark.asyncio
 async def test_migrate_mcp_config():
     """Test the migrate_mcp_config tool."""
@@ -128,6 +236,70 @@ async def test_migrate_mcp_config():
             pytest.skip(f"migrate_mcp_config test failed with error: {str(e)}")
 
 
+def test_migrate_config_backup_keeps_original(monkeypatch):
+    """The target backup still holds the pre-migration config after the merge is written."""
+    from src.mcp_agile_flow.migration_tool import migrate_config
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        source_path = Path(temp_dir) / "cursor.json"
+        target_path = Path(temp_dir) / "windsurf.json"
+        source_path.write_text(json.dumps({"mcpServers": {"a": {"command": "a"}}}))
+        original_target = json.dumps({"mcpServers": {"b": {"command": "b"}}})
+        target_path.write_text(original_target)
+        monkeypatch.setenv("MCP_CURSOR_PATH", str(source_path))
+        monkeypatch.setenv("MCP_WINDSURF_PATH", str(target_path))
+
+        assert migrate_config("cursor", "windsurf") == (True, None, [], {})
+
+        assert set(json.loads(target_path.read_text())["mcpServers"]) == {"a", "b"}
+        assert Path(f"{target_path}.bak").read_text() == original_target
+
+
+def test_migrate_config_conflict_backup_is_independent(monkeypatch):
+    """A backup made for a conflicting migration does not follow later edits to the target."""
+    from src.mcp_agile_flow.migration_tool import migrate_config
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        source_path = Path(temp_dir) / "cursor.json"
+        target_path = Path(temp_dir) / "windsurf.json"
+        source_path.write_text(json.dumps({"mcpServers": {"a": {"command": "new"}}}))
+        original_target = json.dumps({"mcpServers": {"a": {"command": "old"}}})
+        target_path.write_text(original_target)
+        monkeypatch.setenv("MCP_CURSOR_PATH", str(source_path))
+        monkeypatch.setenv("MCP_WINDSURF_PATH", str(target_path))
+
+        success, error, conflicts, _ = migrate_config("cursor", "windsurf")
+        assert (success, error, conflicts) == (True, None, ["a"])
+
+        # Edit the target in place, as an IDE or editor would
+        with open(target_path, "w") as f:
+            f.write("{}")
+        assert Path(f"{target_path}.bak").read_text() == original_target
+
+
+def test_migrate_config_writes_through_symlinked_target(monkeypatch):
+    """A symlinked target stays a symlink and the file it points to gets the merge."""
+    from src.mcp_agile_flow.migration_tool import migrate_config
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        source_path = Path(temp_dir) / "cursor.json"
+        real_target = Path(temp_dir) / "dotfiles" / "windsurf.json"
+        link_path = Path(temp_dir) / "windsurf.json"
+        real_target.parent.mkdir()
+        source_path.write_text(json.dumps({"mcpServers": {"a": {"command": "a"}}}))
+        real_target.write_text(json.dumps({"mcpServers": {"b": {"command": "b"}}}))
+        real_target.chmod(0o600)
+        link_path.symlink_to(real_target)
+        monkeypatch.setenv("MCP_CURSOR_PATH", str(source_path))
+        monkeypatch.setenv("MCP_WINDSURF_PATH", str(link_path))
+
+        assert migrate_config("cursor", "windsurf") == (True, None, [], {})
+
+        assert link_path.is_symlink()
+        assert set(json.loads(real_target.read_text())["mcpServers"]) == {"a", "b"}
+        assert real_target.stat().st_mode & 0o777 == 0o600
+
+
 @pytest.mark.asyncio
 async def test_get_project_settings_with_path():
     """Test the get_project_settings tool with different paths."""
@@ -144,3 +316,93 @@ async def test_get_project_settings_with_path():
         result = await call_tool("get_project_settings", {"proposed_path": temp_dir})
         assert result["success"] is True
         assert result["project_path"] == temp_dir
+
+
+@pytest.mark.asyncio
+async def test_initialize_ide_keeps_existing_cursor_rules():
+    """Re-running initialize_ide does not overwrite rules the user has edited."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        result = await call_tool("initialize_ide", {"ide_type": "cursor", "project_path": temp_dir})
+        assert result["success"] is True
+
+        rule_file = Path(temp_dir) / ".cursor" / "rules" / "001-project-basics.md"
+        assert rule_file.read_text().startswith("# Project Structure")
+        rule_file.write_text("# Edited\n")
+
+        await call_tool("initialize_ide", {"ide_type": "cursor", "project_path": temp_dir})
+        assert rule_file.read_text() == "# Edited\n"
+
+
+@pytest.mark.asyncio
+async def test_initialize_ide_rules_parallel_copy(monkeypatch):
+    """Parallel copying produces the same rules as the sequential path."""
+    with tempfile.TemporaryDirectory() as sequential_dir:
+        await call_tool("initialize_ide_rules", {"ide": "cursor", "project_path": sequential_dir})
+        sequential_rules = sorted(os.listdir(Path(sequential_dir) / ".cursor" / "rules"))
+
+    monkeypatch.setenv("MCP_AGILE_FLOW_PARALLEL_COPY", "1")
+    with tempfile.TemporaryDirectory() as parallel_dir:
+        result = await call_tool(
+            "initialize_ide_rules", {"ide": "cursor", "project_path": parallel_dir}
+        )
+        assert result["success"] is True
+        parallel_rules = sorted(os.listdir(Path(parallel_dir) / ".cursor" / "rules"))
+
+    assert parallel_rules == sequential_rules
+
+
+def test_settings_cache_is_bounded(monkeypatch):
+    """Resolving many distinct paths keeps the settings cache at its size limit."""
+    from src.mcp_agile_flow import fastmcp_tools
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        monkeypatch.chdir(temp_dir)
+        fastmcp_tools.clear_settings_cache()
+        for i in range(fastmcp_tools._SETTINGS_CACHE_SIZE + 20):
+            fastmcp_tools._resolve_project_settings(os.path.join(temp_dir, f"missing-{i}"))
+        assert len(fastmcp_tools._settings_cache) == fastmcp_tools._SETTINGS_CACHE_SIZE
+        fastmcp_tools.clear_settings_cache()
+
+
+def test_initialize_ide_rules_restores_edited_rules(monkeypatch):
+    """Re-initializing restores edited packaged rules and leaves unchanged ones alone."""
+    from src.mcp_agile_flow import initialize_ide_rules as rules_module
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        rules_module.initialize_ide_rules("cursor", temp_dir)
+        rules_dir = Path(temp_dir) / ".cursor" / "rules"
+        packaged = sorted(rules_module._list_cursor_rules())
+        edited = rules_dir / packaged[0].name
+        original = edited.read_bytes()
+        # Same size, different content
+        edited.write_bytes(original[::-1])
+
+        copied = []
+        real_fast_copy = rules_module._fast_copy
+
+        def recording_fast_copy(src, dst):
+            copied.append(Path(dst).name)
+            real_fast_copy(src, dst)
+
+        monkeypatch.setattr(rules_module, "_fast_copy", recording_fast_copy)
+        rules_module.initialize_ide_rules("cursor", temp_dir)
+
+        assert edited.read_bytes() == original
+        assert copied == [edited.name]
+
+
+def test_fast_copy_falls_back_when_copy_file_range_stalls(monkeypatch):
+    """A copy_file_range that stops early still yields a full copy with the source's mode."""
+    from src.mcp_agile_flow.initialize_ide_rules import _fast_copy
+
+    monkeypatch.setattr(os, "copy_file_range", lambda *args: 0, raising=False)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        src = Path(temp_dir) / "rule.md"
+        dst = Path(temp_dir) / "copy.md"
+        src.write_text("# Rule\n" * 100)
+        src.chmod(0o600)
+
+        _fast_copy(src, dst)
+
+        assert dst.read_text() == src.read_text()
+        assert dst.stat().st_mode & 0o777 == 0o600
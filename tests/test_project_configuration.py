@@ -272,3 +272,24 @@ async def test_special_directories():
         # Make a second call and verify the same directory is used
         result2 = await call_tool("get_project_settings", {"proposed_path": temp_dir})
         assert result2["ai_docs_directory"] == result["ai_docs_directory"]
+
+
+@pytest.mark.asyncio
+async def test_project_settings_refresh_after_changes():
+    """Test that repeated settings lookups pick up changes made on disk."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        result1 = await call_tool("get_project_settings", {"proposed_path": temp_dir})
+        assert result1["project_type"] == "generic"
+
+        # Adding a rules file must be visible to the next lookup for the same path
+        (Path(temp_dir) / ".windsurfrules").touch()
+        result2 = await call_tool("get_project_settings", {"proposed_path": temp_dir})
+        assert result2["project_type"] == "windsurf"
+
+        # A proposed path that did not exist yet is used once it is created
+        new_dir = Path(temp_dir) / "later"
+        result3 = await call_tool("get_project_settings", {"proposed_path": str(new_dir)})
+        assert "fallback" in result3["source"]
+        new_dir.mkdir()
+        result4 = await call_tool("get_project_settings", {"proposed_path": str(new_dir)})
+        assert result4["project_path"] == str(new_dir)